@@ -2,7 +2,7 @@
 
 This module provides an interactive console interface to explore:
 - Journey structures
-- Operator analysis
+- Operator analysis (at one station or several at once)
 - Eurostar train detection
 """
 
@@ -12,17 +12,10 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Add project root to path
+# Add project root to path (once, even if this module is re-imported)
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-# Import all script functions
-from src.api_explo.scripts.api_analysis import run_operator_analysis
-from src.api_explo.scripts.check_eurostar import print_eurostar_check
-from src.api_explo.scripts.inspect_journey_structure import (
-    inspect_journey_structure,
-    print_journey_structure,
-)
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 load_dotenv()
 API_KEY = os.getenv("SNCF_API_KEY")
@@ -36,14 +29,22 @@ def print_menu() -> None:
     print("\nAvailable operations:")
     print("  1. Inspect journey structure")
     print("  2. Analyze operators at a station")
-    print("  3. Check for Eurostar trains")
-    print("  4. Run all analyses")
+    print("  3. Analyze operators at several stations")
+    print("  4. Check for Eurostar trains")
+    print("  5. Run all analyses")
     print("  q. Quit")
     print()
 
 
 def run_all_analyses() -> None:
     """Run all available analyses."""
+    from src.api_explo.scripts.api_analysis import run_operator_analysis
+    from src.api_explo.scripts.check_eurostar import print_eurostar_check
+    from src.api_explo.scripts.inspect_journey_structure import (
+        inspect_journey_structure,
+        print_journey_structure,
+    )
+
     print("\n" + "=" * 80)
     print("RUNNING ALL ANALYSES")
     print("=" * 80)
@@ -73,14 +74,21 @@ def main() -> None:
         print("Please set it in your .env file")
         return
 
+    # Script modules (and the API client / requests behind them) are imported
+    # lazily in each branch so the menu shows up without waiting on them
     while True:
         print_menu()
-        choice = input("Select an operation (1-4, q): ").strip().lower()
+        choice = input("Select an operation (1-5, q): ").strip().lower()
 
         if choice == "q":
             print("\nExiting API playground. Goodbye!")
             break
         elif choice == "1":
+            from src.api_explo.scripts.inspect_journey_structure import (
+                inspect_journey_structure,
+                print_journey_structure,
+            )
+
             print("\n" + "=" * 80)
             print("JOURNEY STRUCTURE INSPECTION")
             print("=" * 80)
@@ -88,21 +96,32 @@ def main() -> None:
             if journey:
                 print_journey_structure(journey)
         elif choice == "2":
+            from src.api_explo.scripts.api_analysis import run_operator_analysis
+
             print("\n" + "=" * 80)
             print("OPERATOR ANALYSIS")
             print("=" * 80)
             run_operator_analysis()
         elif choice == "3":
+            from src.api_explo.scripts.api_analysis import run_multi_station_analysis
+
+            print("\n" + "=" * 80)
+            print("MULTI-STATION OPERATOR ANALYSIS")
+            print("=" * 80)
+            run_multi_station_analysis()
+        elif choice == "4":
+            from src.api_explo.scripts.check_eurostar import print_eurostar_check
+
             print("\n" + "=" * 80)
             print("EUROSTAR CHECK")
             print("=" * 80)
             print_eurostar_check()
-        elif choice == "4":
+        elif choice == "5":
             run_all_analyses()
         else:
-            print("Invalid choice. Please select 1-4 or q.")
+            print("Invalid choice. Please select 1-5 or q.")
 
-        if choice in ["1", "2", "3", "4"]:
+        if choice in ["1", "2", "3", "4", "5"]:
             input("\nPress Enter to continue...")
 
 
@@ -7,15 +7,18 @@ This script fetches all departures from a station and analyzes them to find:
 - Sample trains for each operator
 """
 
-import json
 import os
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 API_KEY = os.getenv("SNCF_API_KEY")
@@ -24,6 +27,21 @@ API_KEY = os.getenv("SNCF_API_KEY")
 STATION_NAME = "Paris Gare de Lyon"
 STATION_ID = "stop_area:SNCF:87686006"
 
+# Stations compared by run_multi_station_analysis (Navitia ID -> name)
+STATIONS = {
+    "stop_area:SNCF:87686006": "Paris Gare de Lyon",
+    "stop_area:SNCF:87391003": "Paris Montparnasse",
+    "stop_area:SNCF:87271007": "Paris Gare du Nord",
+    "stop_area:SNCF:87113001": "Paris Gare de l'Est",
+}
+
+# Maximum number of stations analyzed concurrently by analyze_departures_many
+MAX_WORKERS = 8
+
+# Shared session so repeated departures requests reuse kept-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+
 # Get project root for saving output
 project_root = Path(__file__).parent.parent.parent.parent
 
@@ -46,8 +64,8 @@ def analyze_departures(
         - analysis_date: ISO timestamp
         - total_departures: int
         - operators: list of dicts with name, count, examples
-        - physical_modes: list of dicts with name, count
-        - networks: list of dicts with name, count
+        - physical_modes: list of [name, count] pairs, most frequent first
+        - networks: list of [name, count] pairs, most frequent first
     """
     # API endpoint for departures
     base_url = "https://api.navitia.io/v1/"
@@ -56,6 +74,7 @@ def analyze_departures(
     # Get current time for from_datetime parameter
     now = datetime.now()
     from_datetime = now.strftime("%Y%m%dT%H%M%S")
+    analysis_date = now.isoformat()
 
     # Build departures endpoint URL
     url = f"{base_url}coverage/sncf/stop_areas/{station_id}/departures"
@@ -64,76 +83,119 @@ def analyze_departures(
         "from_datetime": from_datetime,
         "count": count,
         "duration": duration,
+        "depth": 0,  # Only display_informations and stop_date_time are read
     }
 
-    response = requests.get(url, headers=headers, params=params, timeout=15)
+    response = _SESSION.get(url, headers=headers, params=params, timeout=15)
     response.raise_for_status()
 
-    data = response.json()
+    data = orjson.loads(response.content)
     departures = data.get("departures", [])
 
     if not departures:
         return {
             "station": {"name": station_name, "id": station_id},
-            "analysis_date": datetime.now().isoformat(),
+            "analysis_date": analysis_date,
             "total_departures": 0,
             "operators": [],
             "physical_modes": [],
             "networks": [],
         }
 
-    # Analyze departures to find all operators and types
-    operators: Counter[str] = Counter()
-    physical_modes: Counter[str] = Counter()
-    networks: Counter[str] = Counter()
-    operator_examples: dict[str, list[dict[str, str]]] = defaultdict(list)
+    # Analyze departures to find all operators and types.
+    # Operator entries are built in their final output shape as they are counted.
+    operators: dict[str, dict[str, Any]] = {}
+    physical_mode_values: list[str] = []
+    network_values: list[str] = []
+
+    # Bind the per-departure method lookups once, outside the loop
+    get_operator = operators.get
+    append_physical_mode = physical_mode_values.append
+    append_network = network_values.append
 
     for dep in departures:
         display_info = dep.get("display_informations", {})
         commercial_mode = display_info.get("commercial_mode", "Unknown")
         physical_mode = display_info.get("physical_mode", "Unknown")
         network = display_info.get("network", "Unknown")
-        train_number = display_info.get("headsign", "N/A")
-        direction = display_info.get("direction", "N/A")
 
-        operators[commercial_mode] += 1
-        physical_modes[physical_mode] += 1
-        networks[network] += 1
+        operator = get_operator(commercial_mode)
+        if operator is None:
+            operator = operators[commercial_mode] = {
+                "name": commercial_mode,
+                "count": 0,
+                "examples": [],
+            }
+        operator["count"] += 1
+        append_physical_mode(physical_mode)
+        append_network(network)
 
         # Store example for each operator (max 3)
-        if len(operator_examples[commercial_mode]) < 3:
-            stop_date_time = dep.get("stop_date_time", {})
-            departure_time = stop_date_time.get("departure_date_time", "N/A")
-            if departure_time != "N/A":
-                dt = datetime.strptime(departure_time, "%Y%m%dT%H%M%S")
-                departure_time = dt.strftime("%H:%M")
-
-            operator_examples[commercial_mode].append(
+        examples = operator["examples"]
+        if len(examples) < 3:
+            departure_time = dep.get("stop_date_time", {}).get("departure_date_time", "N/A")
+            # Navitia timestamps have the fixed layout YYYYMMDDTHHMMSS
+            if len(departure_time) == 15:
+                departure_time = f"{departure_time[9:11]}:{departure_time[11:13]}"
+
+            examples.append(
                 {
                     "time": departure_time,
-                    "train": train_number,
-                    "direction": direction,
+                    "train": display_info.get("headsign", "N/A"),
+                    "direction": display_info.get("direction", "N/A"),
                     "physical_mode": physical_mode,
                     "network": network,
                 }
             )
 
+    # Counter tallies the collected values in C rather than with per-item += 1
+    physical_modes = Counter(physical_mode_values)
+    networks = Counter(network_values)
+
     # Build analysis result
     return {
         "station": {"name": station_name, "id": station_id},
-        "analysis_date": datetime.now().isoformat(),
+        "analysis_date": analysis_date,
         "total_departures": len(departures),
-        "operators": [
-            {"name": op, "count": count, "examples": operator_examples[op]}
-            for op, count in operators.most_common()
-        ],
-        "physical_modes": [
-            {"name": mode, "count": count} for mode, count in physical_modes.most_common()
-        ],
-        "networks": [{"name": net, "count": count} for net, count in networks.most_common()],
+        "operators": sorted(operators.values(), key=itemgetter("count"), reverse=True),
+        # Plain (name, count) pairs: no per-entry dict to build or serialize
+        "physical_modes": physical_modes.most_common(),
+        "networks": networks.most_common(),
     }
 
 
+def analyze_departures_many(
+    stations: dict[str, str], api_key: str, count: int = 100, duration: int = 14400
+) -> dict[str, dict[str, Any]]:
+    """Analyze departures from several stations concurrently.
+
+    Args:
+        stations: Mapping of Navitia station IDs to human-readable station names
+        api_key: Navitia API key
+        count: Number of departures to fetch per station (default: 100)
+        duration: Time window in seconds (default: 14400 = 4 hours)
+
+    Returns:
+        Mapping of station IDs to their analyze_departures() results
+    """
+    if not stations:
+        return {}
+
+    # Each analysis is one blocking departures request, so overlap them in threads
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(stations))) as executor:
+        analyses = executor.map(
+            lambda station: analyze_departures(
+                station_id=station[0],
+                station_name=station[1],
+                api_key=api_key,
+                count=count,
+                duration=duration,
+            ),
+            stations.items(),
+        )
+        return dict(zip(stations, analyses, strict=True))
+
+
 def print_analysis(analysis: dict[str, Any]) -> None:
     """Print formatted analysis results to console.
 
@@ -141,43 +203,52 @@ def print_analysis(analysis: dict[str, Any]) -> None:
         analysis: Analysis dictionary from analyze_departures()
     """
     station = analysis["station"]
-
-    print("=" * 80)
-    print("OPERATOR & TRAIN TYPE ANALYSIS")
-    print("=" * 80)
-    print(f"\nStation: {station['name']}")
-    print(f"Station ID: {station['id']}")
-    print(f"Total departures: {analysis['total_departures']}\n")
-
-    # Print operators
-    print("=" * 80)
-    print("OPERATORS (COMMERCIAL MODES)")
-    print("=" * 80)
-    print(f"\nFound {len(analysis['operators'])} unique operators:\n")
-
+    separator = "=" * 80
+
+    # Build the whole report first and print it once instead of line by line
+    lines = [
+        separator,
+        "OPERATOR & TRAIN TYPE ANALYSIS",
+        separator,
+        f"\nStation: {station['name']}",
+        f"Station ID: {station['id']}",
+        f"Total departures: {analysis['total_departures']}\n",
+    ]
+
+    # Operators
+    lines += [
+        separator,
+        "OPERATORS (COMMERCIAL MODES)",
+        separator,
+        f"\nFound {len(analysis['operators'])} unique operators:\n",
+    ]
     for operator in analysis["operators"]:
-        print(f"• {operator['name']}: {operator['count']} departures")
-        for example in operator["examples"]:
-            print(f"    {example['time']} - Train {example['train']} → {example['direction']}")
-        print()
-
-    # Print physical modes
-    print("=" * 80)
-    print("TRAIN TYPES (PHYSICAL MODES)")
-    print("=" * 80)
-    print(f"\nFound {len(analysis['physical_modes'])} unique train types:\n")
+        lines.append(f"• {operator['name']}: {operator['count']} departures")
+        lines.extend(
+            f"    {example['time']} - Train {example['train']} → {example['direction']}"
+            for example in operator["examples"]
+        )
+        lines.append("")
 
-    for mode in analysis["physical_modes"]:
-        print(f"• {mode['name']}: {mode['count']} departures")
+    # Physical modes
+    lines += [
+        separator,
+        "TRAIN TYPES (PHYSICAL MODES)",
+        separator,
+        f"\nFound {len(analysis['physical_modes'])} unique train types:\n",
+    ]
+    lines.extend(f"• {mode}: {count} departures" for mode, count in analysis["physical_modes"])
 
-    # Print networks
-    print("\n" + "=" * 80)
-    print("NETWORKS")
-    print("=" * 80)
-    print(f"\nFound {len(analysis['networks'])} unique networks:\n")
+    # Networks
+    lines += [
+        "\n" + separator,
+        "NETWORKS",
+        separator,
+        f"\nFound {len(analysis['networks'])} unique networks:\n",
+    ]
+    lines.extend(f"• {network}: {count} departures" for network, count in analysis["networks"])
 
-    for network in analysis["networks"]:
-        print(f"• {network['name']}: {network['count']} departures")
+    print("\n".join(lines))
 
 
 def run_operator_analysis(
@@ -237,8 +308,9 @@ def run_operator_analysis(
             print("=" * 80)
 
             output_file = project_root / "operator_analysis.json"
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(analysis, f, indent=2, ensure_ascii=False)
+            # orjson emits UTF-8 bytes directly, so non-ASCII names stay readable
+            with open(output_file, "wb") as f:
+                f.write(orjson.dumps(analysis, option=orjson.OPT_INDENT_2))
 
             print(f"\n✓ Saved analysis to: {output_file}")
             print("  Contains operator counts, examples, and train types\n")
@@ -253,6 +325,54 @@ def run_operator_analysis(
         return None
 
 
+def run_multi_station_analysis(
+    stations: dict[str, str] | None = None,
+    api_key: str | None = None,
+    count: int = 100,
+    duration: int = 14400,
+) -> dict[str, dict[str, Any]] | None:
+    """Run the operator analysis for several stations at once.
+
+    Args:
+        stations: Mapping of Navitia station IDs to names (uses STATIONS if not provided)
+        api_key: SNCF API key (uses environment variable if not provided)
+        count: Number of departures to fetch per station (default: 100)
+        duration: Time window in seconds (default: 14400 = 4 hours)
+
+    Returns:
+        Mapping of station IDs to analysis dictionaries, or None if error occurs
+    """
+    if api_key is None:
+        api_key = API_KEY
+    if stations is None:
+        stations = STATIONS
+
+    if not api_key:
+        print("ERROR: SNCF_API_KEY not found in environment")
+        print("Please set it in your .env file")
+        return None
+
+    try:
+        print(f"Fetching departures for {len(stations)} stations from API...")
+        analyses = analyze_departures_many(stations, api_key, count=count, duration=duration)
+
+        for analysis in analyses.values():
+            if analysis["total_departures"] == 0:
+                print(f"\nNo departures found for {analysis['station']['name']}")
+            else:
+                print()
+                print_analysis(analysis)
+
+        return analyses
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return None
+
+
 def main() -> None:
     """Main entry point for standalone execution."""
     run_operator_analysis()
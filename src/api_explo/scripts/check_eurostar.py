@@ -1,21 +1,25 @@
 """Functions to check for Eurostar trains between Paris and London."""
 
 import os
+import re
 import sys
 from datetime import datetime, time
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Add project root to path
+# Add project root to path (once, even if this module is re-imported)
 project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from src.backend.sncf_api import SNCFAPIClient
 
 load_dotenv()
 API_KEY = os.getenv("SNCF_API_KEY")
 
+_EUROSTAR_RE = re.compile(r"eurostar", re.IGNORECASE)
+
 
 def check_eurostar_trains(
     paris_nord: str = "stop_area:SNCF:87271007",
@@ -43,15 +47,14 @@ def check_eurostar_trains(
     if api_key is None:
         api_key = API_KEY
 
-    client = SNCFAPIClient(api_key)
-
     today = datetime.now()
     departure_time = datetime.combine(today.date(), time(departure_hour, 0))
     departure_filter = departure_time.strftime("%Y%m%dT%H%M%S")
 
-    journeys = client.get_journeys(
-        paris_nord, london_stpancras, count=count, datetime=departure_filter
-    )
+    with SNCFAPIClient(api_key) as client:
+        journeys = client.get_journeys(
+            paris_nord, london_stpancras, count=count, datetime=departure_filter
+        )
 
     eurostar_found = False
     providers = set()
@@ -65,15 +68,16 @@ def check_eurostar_trains(
 
                 providers.add(commercial_mode)
 
-                if "eurostar" in commercial_mode.lower():
-                    if not eurostar_found:
-                        sample_eurostar = {
-                            "commercial_mode": commercial_mode,
-                            "physical_mode": display_info.get("physical_mode", "N/A"),
-                            "network": display_info.get("network", "N/A"),
-                            "headsign": display_info.get("headsign", "N/A"),
-                        }
-                        eurostar_found = True
+                # Every section is still visited to collect providers, but the
+                # Eurostar match is skipped once a sample has been found
+                if not eurostar_found and _EUROSTAR_RE.search(commercial_mode):
+                    sample_eurostar = {
+                        "commercial_mode": commercial_mode,
+                        "physical_mode": display_info.get("physical_mode", "N/A"),
+                        "network": display_info.get("network", "N/A"),
+                        "headsign": display_info.get("headsign", "N/A"),
+                    }
+                    eurostar_found = True
 
     return {
         "eurostar_found": eurostar_found,
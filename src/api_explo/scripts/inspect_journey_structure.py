@@ -1,15 +1,16 @@
 """Functions to inspect the structure of journey data from Navitia API."""
 
-import json
 import os
 import sys
 from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
 
-# Add project root to path
+# Add project root to path (once, even if this module is re-imported)
 project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from src.backend.sncf_api import SNCFAPIClient
 
@@ -36,10 +37,9 @@ def inspect_journey_structure(
     if api_key is None:
         api_key = API_KEY
 
-    client = SNCFAPIClient(api_key)
-
     print(f"Fetching journeys from {departure_id} to {arrival_id}...")
-    journeys = client.get_journeys(departure_id, arrival_id)
+    with SNCFAPIClient(api_key) as client:
+        journeys = client.get_journeys(departure_id, arrival_id)
 
     if journeys:
         print(f"\nFound {len(journeys)} journeys")
@@ -49,15 +49,21 @@ def inspect_journey_structure(
         return None
 
 
-def print_journey_structure(journey: dict) -> None:
+def print_journey_structure(journey: dict, max_bytes: int = 65536) -> None:
     """Print formatted journey structure.
 
     Args:
         journey: Journey data structure from Navitia API
+        max_bytes: Maximum size of the printed JSON, longer output is truncated
+            (default: 65536)
     """
     print("\nInspecting journey structure:")
     print("=" * 80)
-    print(json.dumps(journey, indent=2))
+    pretty = orjson.dumps(journey, option=orjson.OPT_INDENT_2)
+    # The cut may split a multi-byte character, so drop any partial one
+    print(pretty[:max_bytes].decode(errors="ignore"))
+    if len(pretty) > max_bytes:
+        print(f"... [truncated {len(pretty) - max_bytes} bytes]")
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
-from .sncf_api import SNCFAPIClient
+from .concurrency import map_concurrently
+from .sncf_api import SNCFAPIClient, is_high_speed_mode
 
-__all__ = ["SNCFAPIClient"]
+__all__ = ["SNCFAPIClient", "is_high_speed_mode", "map_concurrently"]
@@ -0,0 +1,25 @@
+"""Thread-pool helper for overlapping blocking Navitia requests."""
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+def map_concurrently(fn: Callable[[Any], Any], items: Iterable[Any], max_workers: int) -> list[Any]:
+    """
+    Call a blocking function on every item from a thread pool.
+
+    Args:
+        fn: Function to call with each item (typically one Navitia request)
+        items: Items to process
+        max_workers: Maximum number of threads; never more than one per item
+
+    Returns:
+        List of fn results, in the same order as items. The first exception
+        raised by fn is re-raised.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(fn, items))
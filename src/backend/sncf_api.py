@@ -1,29 +1,169 @@
 """SNCF API client for querying train schedules via Navitia API."""
 
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
+import diskcache
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import get_logger
 
+from .concurrency import map_concurrently
+
 # Set up logging
 logger = get_logger(__name__)
 
+# Stored in the response cache in place of responses that returned no results
+_EMPTY_RESPONSE = {"_empty": True}
+
+# Physical modes of high-speed trains ("Train grande vitesse", "High speed train", ...)
+_HS_RE = re.compile(r"grande vitesse|high speed", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def is_high_speed_mode(physical_mode: str) -> bool:
+    """Whether a Navitia physical mode is a high-speed train.
+
+    Navitia only uses a couple dozen physical mode names, so after the first few
+    journeys every check is a cache hit.
+
+    Args:
+        physical_mode: physical_mode of a section's display_informations
+
+    Returns:
+        True for high-speed trains (TGV, ICE, Frecciarossa, AVE, ...)
+    """
+    return _HS_RE.search(physical_mode) is not None
+
 
 class SNCFAPIClient:
     """Client for interacting with the Navitia SNCF API."""
 
-    def __init__(self, api_key: str):
+    # Maximum number of Navitia requests kept in flight by fan-out searches
+    MAX_CONCURRENT_REQUESTS = 8
+
+    # On-disk response cache location and entry lifetimes (in seconds)
+    CACHE_DIR = Path(__file__).parent.parent.parent / ".navitia_cache"  # Project root
+    PLACES_CACHE_TTL = 30 * 86400  # Station IDs effectively never change
+    JOURNEYS_CACHE_TTL = 60  # Keep real-time delays fresh
+    VEHICLE_JOURNEYS_CACHE_TTL = 3600  # Base schedules only change with timetable updates
+    NEGATIVE_CACHE_TTL = 60  # Retry empty results (e.g. misspelled names) soon
+    REVALIDATE_WINDOW = 86400  # Keep expired entries with validators for conditional requests
+
+    def __init__(self, api_key: str, cache_dir: Path | None = None):
         """
         Initialize the SNCF API client.
 
         Args:
             api_key: Navitia API key for authentication
+            cache_dir: Directory for the on-disk response cache (default: CACHE_DIR)
         """
         self.api_key = api_key
         self.base_url = "https://api.navitia.io/v1/"
         self.headers = {"Authorization": api_key}
 
+        # Reuse TCP/TLS connections to Navitia across calls (and across threads),
+        # retrying transient gateway errors with a short backoff. Rate-limited (429)
+        # requests are retried too, after waiting for the server's Retry-After delay.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]
+            ),
+        )
+        self.session.mount("https://", adapter)
+
+        # Responses are shared across runs and processes through a disk cache
+        self.cache = diskcache.Cache(cache_dir or self.CACHE_DIR)
+
+    def close(self) -> None:
+        """Close pooled connections and the response cache."""
+        self.session.close()
+        self.cache.close()
+
+    def __enter__(self) -> "SNCFAPIClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _cached_get(
+        self,
+        url: str,
+        params: dict[str, Any],
+        ttl: int,
+        timeout: int,
+        result_key: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Perform a GET request, serving the decoded JSON body from the disk cache when possible.
+
+        Fresh entries are returned without a request. Expired entries that carry an
+        ETag or Last-Modified validator are revalidated with a conditional request,
+        and a 304 Not Modified reply reuses the cached body without decoding anything.
+
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            ttl: Lifetime of the cached response in seconds
+            timeout: Request timeout in seconds
+            result_key: Response field holding the results; when it is missing or empty
+                the response is cached as a negative result for NEGATIVE_CACHE_TTL
+
+        Returns:
+            Decoded JSON response body ({} for a cached negative result)
+        """
+        key = (url, tuple(sorted(params.items())))
+        entry = self.cache.get(key)
+        headers = {}
+        if entry is not None:
+            if entry.get("_empty"):
+                logger.info("Using cached empty result for %s with %s", url, params)
+                return {}
+            if time.time() < entry["fresh_until"]:
+                logger.debug("Cache hit for %s", url)
+                return entry["body"]
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry is not None:
+            logger.debug("Cached response still valid for %s", url)
+            data = entry["body"]
+            etag = entry["etag"]
+            last_modified = entry["last_modified"]
+        else:
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        if result_key and not data.get(result_key):
+            self.cache.set(key, _EMPTY_RESPONSE, expire=self.NEGATIVE_CACHE_TTL)
+        else:
+            entry = {
+                "body": data,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fresh_until": time.time() + ttl,
+            }
+            # Only entries with a validator are worth keeping past their TTL
+            has_validator = etag or last_modified
+            expire = ttl + self.REVALIDATE_WINDOW if has_validator else ttl
+            self.cache.set(key, entry, expire=expire)
+        return data
+
     def get_station_id(self, station_name: str) -> str | None:
         """
         Get the station ID from the station name.
@@ -35,25 +175,26 @@ class SNCFAPIClient:
             Station ID if found, None otherwise
         """
         try:
-            logger.debug(f"Searching for station: {station_name}")
-            response = requests.get(
-                f"{self.base_url}coverage/sncf/places?q={station_name}&type[]=stop_area",
-                headers=self.headers,
+            logger.debug("Searching for station: %s", station_name)
+            data = self._cached_get(
+                f"{self.base_url}coverage/sncf/places",
+                params={"q": station_name, "type[]": "stop_area"},
+                ttl=self.PLACES_CACHE_TTL,
                 timeout=10,
+                result_key="places",
             )
-            response.raise_for_status()
-            places = response.json().get("places")
+            places = data.get("places")
             if places:
                 station_id = places[0]["id"]
-                logger.debug(f"Found station ID: {station_id} for {station_name}")
+                logger.debug("Found station ID: %s for %s", station_id, station_name)
                 return station_id
-            logger.warning(f"No station found for: {station_name}")
+            logger.warning("No station found for: %s", station_name)
             return None
         except requests.exceptions.RequestException as e:
-            logger.error(f"API error while searching for station {station_name}: {e}")
+            logger.error("API error while searching for station %s: %s", station_name, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error while searching for station {station_name}: {e}")
+            logger.error("Unexpected error while searching for station %s: %s", station_name, e)
             raise
 
     def get_journeys(
@@ -73,41 +214,50 @@ class SNCFAPIClient:
             datetime: Optional datetime string in format YYYYMMDDTHHmmss
 
         Returns:
-            List of journey dictionaries with schedule information
+            List of journey dictionaries with schedule information. Responses are
+            requested with depth=0 and without GeoJSON shapes or disruption objects,
+            so only the top-level journey fields and each section's type, from/to
+            stop point, display_informations and (base_)date_times are guaranteed.
         """
         try:
-            logger.debug(f"Fetching journeys from {departure_station_id} to {arrival_station_id}")
-            logger.debug(f"Parameters: count={count}, datetime={datetime}")
+            logger.debug(
+                "Fetching journeys from %s to %s", departure_station_id, arrival_station_id
+            )
+            logger.debug("Parameters: count=%s, datetime=%s", count, datetime)
 
             params = {
                 "from": departure_station_id,
                 "to": arrival_station_id,
                 "count": count,
                 "data_freshness": "realtime",  # Request real-time data when available
+                # Trim the payload to the fields callers read
+                "depth": 0,
+                "disable_geojson": "true",
+                "disable_disruption": "true",
             }
             if datetime:
                 params["datetime"] = datetime
 
-            response = requests.get(
+            data = self._cached_get(
                 f"{self.base_url}coverage/sncf/journeys",
-                headers=self.headers,
                 params=params,
+                ttl=self.JOURNEYS_CACHE_TTL,
                 timeout=15,
+                result_key="journeys",
             )
-            response.raise_for_status()
 
-            journeys = response.json().get("journeys", [])
-            logger.debug(f"Successfully retrieved {len(journeys)} journeys")
+            journeys = data.get("journeys", [])
+            logger.debug("Successfully retrieved %s journeys", len(journeys))
             return journeys
 
         except requests.exceptions.Timeout:
             logger.error("Request timed out while fetching journeys")
             raise
         except requests.exceptions.RequestException as e:
-            logger.error(f"API error while fetching journeys: {e}")
+            logger.error("API error while fetching journeys: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error while fetching journeys: {e}")
+            logger.error("Unexpected error while fetching journeys: %s", e)
             raise
 
     def search_train_by_number(
@@ -119,6 +269,13 @@ class SNCFAPIClient:
         """
         Search for trains by train number across all station pairs.
 
+        The stations served by the train are first looked up with a single
+        vehicle_journeys query, so only pairs among those stations are searched.
+        That lookup matches whole headsigns, so journeys are then matched exactly
+        too (ignoring case and surrounding spaces). If the lookup fails or finds
+        nothing, every station pair is searched and partial numbers still match,
+        e.g. "661" finds 6611 and 6612.
+
         Args:
             train_number: Train number to search for (e.g., "6611")
             stations: List of station IDs to search through
@@ -127,39 +284,122 @@ class SNCFAPIClient:
         Returns:
             List of matching journey dictionaries
         """
+        train_number = train_number.strip()
         try:
-            logger.info(f"Searching for train number: {train_number}")
-            matching_journeys = []
-
-            # Search through all possible station pairs
-            for dep_idx, departure_id in enumerate(stations):
-                for arrival_id in stations[dep_idx + 1:]:
-                    try:
-                        journeys = self.get_journeys(
-                            departure_id,
-                            arrival_id,
-                            count=50,
-                            datetime=datetime
-                        )
-
-                        # Filter for matching train number
-                        for journey in journeys:
-                            for section in journey.get("sections", []):
-                                if section.get("type") == "public_transport":
-                                    display_info = section.get("display_informations", {})
-                                    headsign = display_info.get("headsign", "")
-                                    if train_number.upper() in headsign.upper():
-                                        matching_journeys.append(journey)
-                                        break
-
-                    except Exception as e:
-                        logger.debug(f"No journeys found for {departure_id} to {arrival_id}: {e}")
-                        continue
-
-            msg = f"Found {len(matching_journeys)} journeys matching train number"
-            logger.info(f"{msg} {train_number}")
+            logger.info("Searching for train number: %s", train_number)
+
+            # Restrict the search to the stations the train actually calls at
+            served_ids = self._get_served_station_ids(train_number, datetime)
+            exact = served_ids is not None
+            if exact:
+                stations = [station_id for station_id in stations if station_id in served_ids]
+
+            # Build all possible station pairs
+            pairs = [
+                (departure_id, arrival_id)
+                for dep_idx, departure_id in enumerate(stations)
+                for arrival_id in stations[dep_idx + 1:]
+            ]
+
+            # Query the pairs concurrently; results come back in pair order
+            results = map_concurrently(
+                lambda pair: self._search_pair(train_number, *pair, datetime=datetime, exact=exact),
+                pairs,
+                max_workers=self.MAX_CONCURRENT_REQUESTS,
+            )
+            matching_journeys = [journey for journeys in results for journey in journeys]
+
+            logger.info(
+                "Found %s journeys matching train number %s", len(matching_journeys), train_number
+            )
             return matching_journeys
 
         except Exception as e:
-            logger.error(f"Error searching for train number {train_number}: {e}")
+            logger.error("Error searching for train number %s: %s", train_number, e)
             raise
+
+    def _get_served_station_ids(
+        self, train_number: str, datetime: str | None = None
+    ) -> set[str] | None:
+        """
+        Get the IDs of the stop areas a train calls at, from its vehicle journeys.
+
+        Args:
+            train_number: Train number (headsign) to look up (e.g., "6611")
+            datetime: Optional datetime string in format YYYYMMDDTHHmmss; restricts
+                the lookup to vehicle journeys running on that day
+
+        Returns:
+            Set of stop area IDs, or None if the train could not be found
+        """
+        params: dict[str, Any] = {"headsign": train_number, "depth": 2}
+        if datetime:
+            params["since"] = datetime
+            params["until"] = f"{datetime[:8]}T235959"
+
+        try:
+            data = self._cached_get(
+                f"{self.base_url}coverage/sncf/vehicle_journeys",
+                params=params,
+                ttl=self.VEHICLE_JOURNEYS_CACHE_TTL,
+                timeout=15,
+                result_key="vehicle_journeys",
+            )
+        except Exception as e:
+            logger.debug("Vehicle journey lookup failed for train %s: %s", train_number, e)
+            return None
+
+        served_ids = {
+            stop_time["stop_point"]["stop_area"]["id"]
+            for vehicle_journey in data.get("vehicle_journeys", [])
+            for stop_time in vehicle_journey.get("stop_times", [])
+            if "stop_area" in stop_time.get("stop_point", {})
+        }
+        if not served_ids:
+            logger.debug("No vehicle journey found for train %s", train_number)
+            return None
+
+        logger.debug("Train %s serves %s stop areas", train_number, len(served_ids))
+        return served_ids
+
+    def _search_pair(
+        self,
+        train_number: str,
+        departure_id: str,
+        arrival_id: str,
+        datetime: str | None = None,
+        exact: bool = False
+    ) -> list[dict[str, Any]]:
+        """
+        Find journeys between one station pair whose headsign matches a train number.
+
+        Args:
+            train_number: Train number to search for (e.g., "6611")
+            departure_id: ID of the departure station
+            arrival_id: ID of the arrival station
+            datetime: Optional datetime string in format YYYYMMDDTHHmmss
+            exact: Match the whole headsign instead of any headsign containing
+                the train number
+
+        Returns:
+            List of matching journey dictionaries (empty if the pair has none)
+        """
+        try:
+            journeys = self.get_journeys(departure_id, arrival_id, count=50, datetime=datetime)
+        except Exception as e:
+            logger.debug("No journeys found for %s to %s: %s", departure_id, arrival_id, e)
+            return []
+
+        # Filter for matching train number
+        train_number = train_number.upper()
+        matching_journeys = []
+        for journey in journeys:
+            for section in journey.get("sections", []):
+                if section.get("type") == "public_transport":
+                    display_info = section.get("display_informations", {})
+                    headsign = display_info.get("headsign", "").strip().upper()
+                    matches = headsign == train_number if exact else train_number in headsign
+                    if matches:
+                        matching_journeys.append(journey)
+                        break
+        return matching_journeys
@@ -7,15 +7,18 @@ This module provides utilities to:
 
 import os
 import sys
+import unicodedata
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Add project root to path
+# Add project root to path (once, even if this module is re-imported)
 project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-from src.backend.sncf_api import SNCFAPIClient
+from src.backend.concurrency import map_concurrently
+from src.backend.sncf_api import SNCFAPIClient, is_high_speed_mode
 from src.config.logger import get_logger
 
 load_dotenv()
@@ -24,6 +27,12 @@ API_KEY = os.getenv("SNCF_API_KEY")
 logger = get_logger(__name__)
 
 
+def _normalize_station_name(station_name: str) -> str:
+    """Normalize a station name so case, accent and whitespace variants compare equal."""
+    decomposed = unicodedata.normalize("NFD", station_name.strip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
 def lookup_station_ids(station_names: list[str], api_key: str | None = None) -> dict[str, str]:
     """Look up station IDs for given station names.
 
@@ -37,17 +46,40 @@ def lookup_station_ids(station_names: list[str], api_key: str | None = None) ->
     if api_key is None:
         api_key = API_KEY
 
-    client = SNCFAPIClient(api_key)
+    if not station_names:
+        return {}
+
+    # Case, accent and whitespace variants of a name (e.g. "Zürich" and "zurich")
+    # resolve to the same Navitia query, so only look up each normalized name once
+    queries: dict[str, str] = {}
+    for station_name in station_names:
+        queries.setdefault(_normalize_station_name(station_name), station_name.strip())
+
+    # Look up stations concurrently; the client's session pool is shared by all workers
+    with SNCFAPIClient(api_key) as client:
+        station_ids = map_concurrently(
+            client.get_station_id, queries.values(), max_workers=client.MAX_CONCURRENT_REQUESTS
+        )
+    ids_by_query = dict(zip(queries, station_ids, strict=True))
 
+    # Map results back onto the names as given by the caller
     results = {}
     for station_name in station_names:
-        station_id = client.get_station_id(station_name)
+        station_id = ids_by_query[_normalize_station_name(station_name)]
         if station_id:
             results[station_name] = station_id
 
     return results
 
 
+def _is_high_speed_section(section: dict) -> bool:
+    """Check whether a journey section is a high-speed public transport leg."""
+    if section.get("type") != "public_transport":
+        return False
+    physical_mode = section.get("display_informations", {}).get("physical_mode", "")
+    return is_high_speed_mode(physical_mode)
+
+
 def check_connection(
     client: SNCFAPIClient, from_id: str, to_id: str, from_name: str, to_name: str
 ) -> bool:
@@ -65,25 +97,14 @@ def check_connection(
     """
     try:
         journeys = client.get_journeys(from_id, to_id, count=10)
-        # Filter for high-speed trains (no transfers)
-        hs_journeys = [
-            j
+        # Stop at the first direct high-speed journey
+        return any(
+            j.get("nb_transfers", 0) == 0
+            and any(_is_high_speed_section(section) for section in j.get("sections", []))
             for j in journeys
-            if j.get("nb_transfers", 0) == 0
-            and any(
-                section.get("type") == "public_transport"
-                and (
-                    "grande vitesse"
-                    in section.get("display_informations", {}).get("physical_mode", "").lower()
-                    or "high speed"
-                    in section.get("display_informations", {}).get("physical_mode", "").lower()
-                )
-                for section in j.get("sections", [])
-            )
-        ]
-        return len(hs_journeys) > 0
+        )
     except Exception as e:
-        logger.debug(f"Error checking {from_name} -> {to_name}: {e}")
+        logger.debug("Error checking %s -> %s: %s", from_name, to_name, e)
         return False
 
 
@@ -6,6 +6,7 @@ all modules in the application.
 
 import logging
 import sys
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 
@@ -19,6 +20,8 @@ class LoggerConfig:
     # Log file location
     LOG_DIR = Path(__file__).parent.parent.parent  # Project root
     LOG_FILE = LOG_DIR / "tgvtimes.log"
+    LOG_MAX_BYTES = 10_000_000  # Rotate the log file at ~10 MB
+    LOG_BACKUP_COUNT = 3
 
     _configured = False
 
@@ -44,8 +47,14 @@ class LoggerConfig:
         console_handler.setLevel(level)
         console_handler.setFormatter(formatter)
 
-        # File handler
-        file_handler = logging.FileHandler(cls.LOG_FILE, mode='a', encoding='utf-8')
+        # File handler (rotated so the log cannot grow without bound)
+        file_handler = RotatingFileHandler(
+            cls.LOG_FILE,
+            mode='a',
+            maxBytes=cls.LOG_MAX_BYTES,
+            backupCount=cls.LOG_BACKUP_COUNT,
+            encoding='utf-8',
+        )
         file_handler.setLevel(logging.DEBUG)  # Log everything to file
         file_handler.setFormatter(formatter)
 
@@ -1,20 +1,22 @@
 """Streamlit UI for TGV Times train schedule application."""
 
-import json
 import os
 from datetime import datetime, time, timedelta
 from pathlib import Path
+from time import monotonic
 from zoneinfo import ZoneInfo
 
+import orjson
 import streamlit as st
 from dotenv import load_dotenv
 
-from backend import SNCFAPIClient
+from backend import SNCFAPIClient, map_concurrently
 from config import get_logger
 from frontend.utils import (
     apply_row_styling,
     filter_tgv_journeys,
     format_journey_data,
+    format_navitia_datetime,
 )
 
 # Load environment variables from .env (local) or Streamlit secrets (cloud)
@@ -32,32 +34,81 @@ logger = get_logger(__name__)
 # Use Paris timezone for all train schedules (regardless of server location)
 PARIS_TZ = ZoneInfo("Europe/Paris")
 
+# Hand-maintained station configuration (IDs, countries and connections)
+STATIONS_FILE = Path(__file__).parent.parent / "config" / "appdata" / "stations.json"
 
-def load_station_config():
-    """Load station configuration from JSON file."""
+# How long the Paris "now" used for the date and time defaults is reused across reruns
+NOW_CACHE_SECONDS = 30
+
+
+@st.cache_resource(show_spinner=False)
+def load_station_config(mtime: float):
+    """Load station configuration from JSON file.
+
+    A single parsed dict is shared across reruns and sessions (callers must not
+    modify it); passing the file's modification time makes edits to
+    stations.json invalidate the cache.
+
+    Args:
+        mtime: Modification time of STATIONS_FILE
+    """
     try:
-        config_path = Path(__file__).parent.parent / "config" / "appdata" / "stations.json"
-        logger.debug(f"Loading station config from: {config_path}")
-        with open(config_path) as f:
-            config = json.load(f)
-        logger.info(f"Successfully loaded {len(config)} stations")
+        logger.debug("Loading station config from: %s", STATIONS_FILE)
+        config = orjson.loads(STATIONS_FILE.read_bytes())
+        logger.info("Successfully loaded %s stations", len(config))
         return config
     except FileNotFoundError:
-        logger.error(f"Station configuration file not found: {config_path}")
+        logger.error("Station configuration file not found: %s", STATIONS_FILE)
         raise
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in station configuration: {e}")
+    except orjson.JSONDecodeError as e:
+        logger.error("Invalid JSON in station configuration: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error loading station configuration: {e}")
+        logger.error("Unexpected error loading station configuration: %s", e)
         raise
 
 
-try:
-    STATION_CONFIG = load_station_config()
-except Exception as e:
-    logger.critical(f"Failed to load station configuration: {e}")
-    STATION_CONFIG = {}
+@st.cache_resource(show_spinner=False)
+def build_station_lookups(mtime: float):
+    """Build the station lookups used by the sidebar from the station configuration.
+
+    Args:
+        mtime: Modification time of STATIONS_FILE
+
+    Returns:
+        Tuple of (station names, dict mapping station names to their Navitia IDs,
+        dict mapping station names to their connections)
+    """
+    config = load_station_config(mtime)
+    stations = tuple(config)
+    station_ids = {name: info["id"] for name, info in config.items()}
+    connections = {name: tuple(info.get("connections", ())) for name, info in config.items()}
+    return stations, station_ids, connections
+
+
+@st.cache_resource(show_spinner=False)
+def get_api_client(api_key: str) -> SNCFAPIClient:
+    """Create the API client shared by all reruns and sessions.
+
+    Reusing one client keeps its keep-alive connections to Navitia warm and its
+    response cache open instead of rebuilding both on every widget interaction.
+
+    Args:
+        api_key: Navitia API key
+    """
+    return SNCFAPIClient(api_key)
+
+
+def get_paris_now() -> datetime:
+    """Return the current Paris time, reused across reruns for NOW_CACHE_SECONDS.
+
+    Returns:
+        Timezone-aware datetime in Europe/Paris
+    """
+    cached = st.session_state.get("_now_ts")
+    if cached is None or monotonic() - cached[0] > NOW_CACHE_SECONDS:
+        cached = st.session_state["_now_ts"] = (monotonic(), datetime.now(PARIS_TZ))
+    return cached[1]
 
 
 def main():
@@ -73,24 +124,31 @@ def main():
         st.error("API key not configured. Please set SNCF_API_KEY in your .env file.")
         return
 
+    # Load station configuration (cached until stations.json changes)
+    try:
+        config_mtime = STATIONS_FILE.stat().st_mtime
+        station_config = load_station_config(config_mtime)
+        all_stations, station_ids, station_connections = build_station_lookups(config_mtime)
+    except Exception as e:
+        logger.critical("Failed to load station configuration: %s", e)
+        station_config = {}
+
     # Check if station config is loaded
-    if not STATION_CONFIG:
+    if not station_config:
         logger.error("Station configuration not loaded")
         st.error("Station configuration not loaded. Please check the logs.")
         return
 
     # Initialize API client
     try:
-        client = SNCFAPIClient(API_KEY)
+        client = get_api_client(API_KEY)
         logger.debug("API client initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize API client: {e}")
+        logger.error("Failed to initialize API client: %s", e)
         st.error(f"Failed to initialize API client: {e}")
         return
 
-    # Get list of stations from config
-    all_stations = list(STATION_CONFIG.keys())
-    logger.debug(f"Loaded {len(all_stations)} total stations")
+    logger.debug("Loaded %s total stations", len(all_stations))
 
     # Sidebar filters
     st.sidebar.header("Search Mode")
@@ -99,230 +157,194 @@ def main():
     st.sidebar.header("Filters")
 
     if search_mode == "Station Board":
-        # Single station selection
+        # Station, board type and the time filter toggle stay outside the form:
+        # they decide which filter options and inputs the form shows
         selected_station = st.sidebar.selectbox("Select Station:", all_stations, index=3)
 
         # Departure or Arrival toggle
         board_type = st.sidebar.radio("Show:", ["Departures", "Arrivals"], index=0)
 
-        # Get list of connected stations for filtering
-        connections = STATION_CONFIG[selected_station].get("connections", [])
-
-        # Add "All" option to the connections list
-        filter_options = ["All", *connections]
-
-        # Filter by origin/destination station
-        if board_type == "Departures":
-            station_filter = st.sidebar.selectbox("Filter by destination:", filter_options, index=0)
-        else:  # Arrivals
-            station_filter = st.sidebar.selectbox("Filter by origin:", filter_options, index=0)
+        use_time_filter = st.sidebar.checkbox("Filter by time", value=True)
 
-        train_number = None
+        # Get list of connected stations for filtering
+        connections = station_connections[selected_station]
     else:
-        # Train Number search mode
-        train_number = st.sidebar.text_input("Train Number:", placeholder="e.g., 6611")
         selected_station = None
         board_type = None
-        station_filter = None
-
-    # Date filter
-    st.sidebar.subheader("Date & Time Filter")
-
-    # Day selection (use Paris timezone)
-    today = datetime.now(PARIS_TZ).date()
-    selected_date = st.sidebar.date_input(
-        "Travel Date:", value=today, min_value=today, max_value=today + timedelta(days=60)
-    )
-
-    # Time filter (only for station board mode)
-    selected_time = None
-    use_time_filter = False
-    if search_mode == "Station Board":
-        use_time_filter = st.sidebar.checkbox("Filter by time", value=True)
-        datetime_filter = None
-
+        use_time_filter = False
+
+    # The remaining filters only take effect when the form is submitted, so
+    # editing several of them triggers a single search instead of one per change
+    with st.sidebar.form("filters"):
+        if search_mode == "Station Board":
+            # Add "All" option to the connections list
+            filter_options = ["All", *connections]
+
+            # Filter by origin/destination station
+            if board_type == "Departures":
+                station_filter = st.selectbox("Filter by destination:", filter_options, index=0)
+            else:  # Arrivals
+                station_filter = st.selectbox("Filter by origin:", filter_options, index=0)
+
+            train_number = None
+        else:
+            # Train Number search mode
+            train_number = st.text_input("Train Number:", placeholder="e.g., 6611")
+            station_filter = None
+
+        # Date filter
+        st.subheader("Date & Time Filter")
+
+        # Day selection (use Paris timezone)
+        now = get_paris_now()
+        today = now.date()
+        selected_date = st.date_input(
+            "Travel Date:", value=today, min_value=today, max_value=today + timedelta(days=60)
+        )
+
+        # Time filter (only for station board mode)
+        selected_time = None
         if use_time_filter:
             time_label = "Departures after:" if board_type == "Departures" else "Arrivals after:"
-            # Default to current time for real-time upcoming trains (Paris timezone)
-            current_time = datetime.now(PARIS_TZ).time()
-            # Round down to nearest 5 minutes for cleaner display
-            current_minute = (current_time.minute // 5) * 5
-            default_time = time(current_time.hour, current_minute)
-            selected_time = st.sidebar.time_input(time_label, value=default_time)
+            # Default to current time for real-time upcoming trains, rounded
+            # down to the nearest 5 minutes for cleaner display
+            default_time = time(now.hour, now.minute // 5 * 5)
+            selected_time = st.time_input(time_label, value=default_time)
             filter_datetime = datetime.combine(selected_date, selected_time)
-            datetime_filter = filter_datetime.strftime("%Y%m%dT%H%M%S")
         else:
-            # If no time filter, use start of selected day
+            # Without a time filter (and for train number search), use start of day
             filter_datetime = datetime.combine(selected_date, time(0, 0))
-            datetime_filter = filter_datetime.strftime("%Y%m%dT%H%M%S")
-    else:
-        # For train number search, use start of day
-        filter_datetime = datetime.combine(selected_date, time(0, 0))
-        datetime_filter = filter_datetime.strftime("%Y%m%dT%H%M%S")
-
-    # Provider filter
-    st.sidebar.subheader("Provider Filter")
-    provider_options = [
-        "All",
-        "TGV INOUI",
-        "OUIGO",
-        "TGV Lyria",
-        "Eurostar",
-        "DB SNCF",
-        "Trenitalia",
-        "Renfe",
-    ]
-    provider_filter = st.sidebar.selectbox(
-        "High-Speed Provider:",
-        provider_options,
-        index=0,
-        help="Filter trains by operator:\n"
-        "• TGV INOUI: Standard SNCF service\n"
-        "• OUIGO: Low-cost SNCF option\n"
-        "• TGV Lyria: France-Switzerland service\n"
-        "• Eurostar: France-UK service\n"
-        "• DB SNCF: Germany-France service\n"
-        "• Trenitalia: Italian high-speed trains\n"
-        "• Renfe: Spanish high-speed trains",
-    )
-
-    # Result limit filter
-    st.sidebar.subheader("Display Options")
-    limit_options = ["1", "5", "10", "25", "All"]
-    limit_selection = st.sidebar.selectbox(
-        "Trains per route:",
-        limit_options,
-        index=3,  # Default to 25
-        help="Maximum number of trains to fetch per route",
-    )
-    # Convert selection to API count parameter
-    result_limit = 1000 if limit_selection == "All" else int(limit_selection)
-
-    # Initialize session state for auto-load and tracking settings changes
-    if "initial_load" not in st.session_state:
-        st.session_state.initial_load = True
-    if "last_settings" not in st.session_state:
-        st.session_state.last_settings = {}
-
-    # Build current settings dictionary
-    if search_mode == "Station Board":
-        current_settings = {
-            "mode": search_mode,
-            "station": selected_station,
-            "board_type": board_type,
-            "station_filter": station_filter,
-            "date": selected_date,
-            "use_time_filter": use_time_filter,
-            "time": selected_time if use_time_filter else None,
-            "provider": provider_filter,
-            "limit": limit_selection,
-        }
-    else:
-        current_settings = {
-            "mode": search_mode,
-            "train_number": train_number,
-            "date": selected_date,
-            "provider": provider_filter,
-            "limit": limit_selection,
-        }
-
-    # Check if settings have changed
-    settings_changed = st.session_state.last_settings != current_settings
-
-    # Auto-load on page load, when search button is clicked, or when settings change
-    search_clicked = st.sidebar.button("Search Trains", type="primary")
-    should_load = (
-        search_clicked
-        or (st.session_state.initial_load and search_mode == "Station Board")
-        or (settings_changed and not st.session_state.initial_load)
+        datetime_filter = format_navitia_datetime(filter_datetime)
+
+        # Provider filter
+        st.subheader("Provider Filter")
+        provider_options = [
+            "All",
+            "TGV INOUI",
+            "OUIGO",
+            "TGV Lyria",
+            "Eurostar",
+            "DB SNCF",
+            "Trenitalia",
+            "Renfe",
+        ]
+        provider_filter = st.selectbox(
+            "High-Speed Provider:",
+            provider_options,
+            index=0,
+            help="Filter trains by operator:\n"
+            "• TGV INOUI: Standard SNCF service\n"
+            "• OUIGO: Low-cost SNCF option\n"
+            "• TGV Lyria: France-Switzerland service\n"
+            "• Eurostar: France-UK service\n"
+            "• DB SNCF: Germany-France service\n"
+            "• Trenitalia: Italian high-speed trains\n"
+            "• Renfe: Spanish high-speed trains",
+        )
+
+        # Result limit filter
+        st.subheader("Display Options")
+        limit_options = ["1", "5", "10", "25", "All"]
+        limit_selection = st.selectbox(
+            "Trains per route:",
+            limit_options,
+            index=3,  # Default to 25
+            help="Maximum number of trains to fetch per route",
+        )
+        # Convert selection to API count parameter
+        result_limit = 1000 if limit_selection == "All" else int(limit_selection)
+
+        search_clicked = st.form_submit_button("Search Trains", type="primary")
+
+    # Widgets outside the form apply immediately, so reload whenever one of them
+    # changes (including the first run of a session). Form filters only apply on submit.
+    view_settings = (search_mode, selected_station, board_type, use_time_filter)
+    last_view = st.session_state.get("last_view")
+    st.session_state.last_view = view_settings
+    view_changed = last_view != view_settings
+    should_load = search_clicked or (
+        view_changed and (search_mode == "Station Board" or bool(train_number))
     )
 
-    # Update last settings
     if should_load:
-        st.session_state.last_settings = current_settings
-
-    if should_load:
-        # Mark initial load as complete
-        if st.session_state.initial_load:
-            st.session_state.initial_load = False
+        if search_clicked:
+            logger.info("Manual search triggered by user")
+        elif last_view is None:
             logger.info("Performing initial data load")
-        elif settings_changed:
+        else:
             logger.info("Settings changed - auto-reloading data")
-        elif search_clicked:
-            logger.info("Manual search triggered by user")
 
         try:
             with st.spinner("Loading train schedules..."):
                 if search_mode == "Station Board":
                     logger.info(
-                        f"Station Board: {selected_station} - "
-                        f"{board_type} (filter: {station_filter})"
+                        "Station Board: %s - %s (filter: %s)",
+                        selected_station,
+                        board_type,
+                        station_filter,
                     )
-                    logger.debug(f"Date: {selected_date}, Time filter: {use_time_filter}")
+                    logger.debug("Date: %s, Time filter: %s", selected_date, use_time_filter)
 
                     # Get station ID from config
-                    station_id = STATION_CONFIG[selected_station]["id"]
+                    station_id = station_ids[selected_station]
 
                     # Get all journeys from/to this station
                     # We need to query all connected stations
-                    all_journeys = []
-
                     if board_type == "Departures":
                         # For departures, query from this station to all connected stations
                         destinations = connections if station_filter == "All" else [station_filter]
-
-                        for dest in destinations:
-                            dest_id = STATION_CONFIG[dest]["id"]
-                            journeys = client.get_journeys(
-                                station_id, dest_id, count=result_limit, datetime=datetime_filter
-                            )
-                            all_journeys.extend(journeys)
+                        routes = [(station_id, station_ids[dest]) for dest in destinations]
                     else:  # Arrivals
                         # For arrivals, query from all connected stations to this station
                         origins = connections if station_filter == "All" else [station_filter]
+                        routes = [(station_ids[origin], station_id) for origin in origins]
+
+                    # Query the routes concurrently; results come back in route order
+                    results = map_concurrently(
+                        lambda route: client.get_journeys(
+                            *route, count=result_limit, datetime=datetime_filter
+                        ),
+                        routes,
+                        max_workers=client.MAX_CONCURRENT_REQUESTS,
+                    )
+                    all_journeys = [journey for journeys in results for journey in journeys]
 
-                        for origin in origins:
-                            origin_id = STATION_CONFIG[origin]["id"]
-                            journeys = client.get_journeys(
-                                origin_id, station_id, count=result_limit, datetime=datetime_filter
-                            )
-                            all_journeys.extend(journeys)
-
-                    logger.info(f"Retrieved {len(all_journeys)} total journeys")
+                    logger.info("Retrieved %s total journeys", len(all_journeys))
 
                     # Filter for direct high-speed trains with optional provider filter
                     provider_param = None if provider_filter == "All" else provider_filter
                     tgv_journeys = filter_tgv_journeys(all_journeys, provider_param)
                     provider_msg = f" ({provider_filter})" if provider_filter != "All" else ""
-                    msg = f"Filtered to {len(tgv_journeys)} direct high-speed trains"
-                    logger.info(msg + provider_msg)
+                    logger.info(
+                        "Filtered to %s direct high-speed trains%s", len(tgv_journeys), provider_msg
+                    )
 
                 else:  # Train Number search mode
                     if not train_number:
                         st.warning("Please enter a train number to search.")
                         return
 
-                    logger.info(f"Searching for train number: {train_number}")
-
-                    # Get all station IDs
-                    station_ids = [STATION_CONFIG[station]["id"] for station in all_stations]
+                    logger.info("Searching for train number: %s", train_number)
 
-                    # Search for train by number
+                    # Search for train by number across all station IDs
                     all_journeys = client.search_train_by_number(
-                        train_number, station_ids, datetime=datetime_filter
+                        train_number, list(station_ids.values()), datetime=datetime_filter
                     )
 
-                    logger.info(f"Retrieved {len(all_journeys)} journeys for train {train_number}")
+                    logger.info(
+                        "Retrieved %s journeys for train %s", len(all_journeys), train_number
+                    )
 
                     # Filter for direct high-speed trains with optional provider filter
                     provider_param = None if provider_filter == "All" else provider_filter
                     tgv_journeys = filter_tgv_journeys(all_journeys, provider_param)
                     provider_msg = f" ({provider_filter})" if provider_filter != "All" else ""
-                    msg = f"Filtered to {len(tgv_journeys)} direct high-speed trains"
-                    logger.info(msg + provider_msg)
+                    logger.info(
+                        "Filtered to %s direct high-speed trains%s", len(tgv_journeys), provider_msg
+                    )
 
         except Exception as e:
-            logger.error(f"Error fetching train data: {e}", exc_info=True)
+            logger.error("Error fetching train data: %s", e, exc_info=True)
             st.error(f"Error fetching train schedules: {e!s}")
             st.info("Please try again or check your network connection.")
             return
@@ -354,26 +376,28 @@ def main():
                 sort_criterion = "departure"  # Default for train number search
 
             df, _full_journeys = format_journey_data(tgv_journeys, sort_by=sort_criterion)
-            logger.debug(f"Formatted {len(df)} journeys for display (sorted by {sort_criterion})")
+            logger.debug(
+                "Formatted %s journeys for display (sorted by %s)", len(df), sort_criterion
+            )
 
-            # Display styled table (hide ID column)
-            display_df = df.drop(columns=["ID"])
-            styled_df = display_df.style.apply(apply_row_styling, axis=1)
+            # Display styled table (the index only maps rows back to journeys)
+            styled_df = df.style.apply(apply_row_styling, axis=None)
             st.dataframe(styled_df, width="stretch", hide_index=True)
 
-            # Summary statistics
+            # Summary statistics (one pass over the Status column for both counts)
+            status_counts = df["Status"].value_counts()
             col1, col2, col3 = st.columns(3)
             with col1:
-                delayed_count = len(df[df["Status"] == "Delayed"])
+                delayed_count = int(status_counts.get("Delayed", 0))
                 st.metric("Delayed Trains", delayed_count)
             with col2:
-                on_time_count = len(df[df["Status"] == "On Time"])
+                on_time_count = int(status_counts.get("On Time", 0))
                 st.metric("On Time", on_time_count)
             with col3:
                 avg_delay = df["Arr. Delay"].mean()
                 st.metric("Avg Arrival Delay", f"{avg_delay:.0f} min")
 
-            logger.info(f"Dashboard displayed successfully with {len(df)} trains")
+            logger.info("Dashboard displayed successfully with %s trains", len(df))
 
         else:
             if all_journeys:
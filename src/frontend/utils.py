@@ -2,112 +2,182 @@
 
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
+from backend import is_high_speed_mode
+
+# Shared read-only default for chained .get() lookups on optional journey fields
+_EMPTY: dict = {}
+
 
 def calculate_delay_minutes(scheduled_time: str, actual_time: str) -> int:
-    """Calculate delay in minutes between scheduled and actual times."""
-    scheduled = datetime.strptime(scheduled_time, "%Y%m%dT%H%M%S")
-    actual = datetime.strptime(actual_time, "%Y%m%dT%H%M%S")
-    delay_seconds = (actual - scheduled).total_seconds()
-    return int(delay_seconds / 60)
+    """Calculate delay in minutes between scheduled and actual times.
+
+    Single-pair form of the column computation used by format_journey_data.
+    """
+    delays = _delay_minutes(_parse_timestamps([scheduled_time]), _parse_timestamps([actual_time]))
+    return int(delays[0])
+
+
+def format_navitia_datetime(dt: datetime) -> str:
+    """Format a datetime in Navitia's YYYYMMDDTHHmmss layout without going through strftime."""
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+
+
+def _first_public_transport_section(journey: dict) -> dict | None:
+    """Return the journey's first public_transport section, or None if it has none."""
+    return next(
+        (s for s in journey.get("sections", ()) if s.get("type") == "public_transport"), None
+    )
+
+
+def _section_labels(section: dict) -> tuple[str, str, str, str]:
+    """Return (from, to, headsign, commercial mode) of a section, "N/A" for missing fields.
+
+    Complete sections are read with direct subscripts; the defensive .get() chains
+    only run for the rare section missing one of the fields.
+    """
+    try:
+        display_info = section["display_informations"]
+        return (
+            section["from"]["stop_point"]["name"],
+            section["to"]["stop_point"]["name"],
+            display_info["headsign"],
+            display_info["commercial_mode"],
+        )
+    except (KeyError, TypeError):
+        display_info = section.get("display_informations", _EMPTY)
+        return (
+            section.get("from", _EMPTY).get("stop_point", _EMPTY).get("name", "N/A"),
+            section.get("to", _EMPTY).get("stop_point", _EMPTY).get("name", "N/A"),
+            display_info.get("headsign", "N/A"),
+            display_info.get("commercial_mode", "N/A"),
+        )
+
+
+def _parse_timestamps(values: list) -> pd.DatetimeIndex:
+    """Parse a column of Navitia timestamps at once; None becomes NaT.
+
+    cache=True lets pandas parse each distinct timestamp only once.
+    """
+    return pd.to_datetime(values, format="%Y%m%dT%H%M%S", cache=True)
+
+
+def _delay_minutes(scheduled: pd.DatetimeIndex, actual: pd.DatetimeIndex) -> np.ndarray:
+    """Whole minutes between two timestamp columns, truncated toward zero, 0 when missing."""
+    delay_seconds = (actual - scheduled).total_seconds().to_numpy()
+    return np.nan_to_num(np.trunc(delay_seconds / 60)).astype("int32")
 
 
 def format_journey_data(journeys: list, sort_by: str = "departure") -> tuple[pd.DataFrame, list]:
     """Convert journey data to a pandas DataFrame and keep full journey data.
 
+    Fields are gathered column by column in a single pass over the journeys, then
+    timestamps are parsed and delays computed on whole columns at once.
+
     Args:
         journeys: List of journey dictionaries from Navitia API
         sort_by: Sort criterion - "departure" or "arrival" (default: "departure")
 
     Returns:
-        Tuple of (DataFrame for display, list of full journey objects)
+        Tuple of (DataFrame for display, list of full journey objects). The
+        DataFrame index holds each row's position in the journeys list.
     """
-    data = []
-    for idx, journey in enumerate(journeys):
-        departure_time = datetime.strptime(
-            journey["departure_date_time"], "%Y%m%dT%H%M%S"
-        )
-        arrival_time = datetime.strptime(
-            journey["arrival_date_time"], "%Y%m%dT%H%M%S"
-        )
-
-        # Extract station names and provider from sections
-        sections = journey.get("sections", [])
+    departures = []
+    arrivals = []
+    base_departures = []
+    actual_departures = []
+    base_arrivals = []
+    actual_arrivals = []
+    providers = []
+    train_numbers = []
+    departure_stations = []
+    arrival_stations = []
+    durations = []
+
+    for journey in journeys:
+        departures.append(journey["departure_date_time"])
+        arrivals.append(journey["arrival_date_time"])
+
+        # Extract station names, provider and times from the public_transport section
         departure_station = "N/A"
         arrival_station = "N/A"
         train_number = "N/A"
         provider = "N/A"
-
-        for section in sections:
-            if section.get("type") == "public_transport":
-                departure_station = section.get("from", {}).get("stop_point", {}).get("name", "N/A")
-                arrival_station = section.get("to", {}).get("stop_point", {}).get("name", "N/A")
-                train_number = section.get("display_informations", {}).get("headsign", "N/A")
-                provider = section.get("display_informations", {}).get("commercial_mode", "N/A")
-                break
-
-        # Get base (scheduled) times and actual times from public_transport section
-        sections = journey.get("sections", [])
-        departure_delay = 0
-        arrival_delay = 0
-
-        # Find the public_transport section
-        for section in sections:
-            if section.get("type") == "public_transport":
-                base_departure = section.get("base_departure_date_time")
-                actual_departure = section.get("departure_date_time")
-                base_arrival = section.get("base_arrival_date_time")
-                actual_arrival = section.get("arrival_date_time")
-
-                # Calculate delays by comparing base vs actual times
-                if base_departure and actual_departure:
-                    departure_delay = calculate_delay_minutes(base_departure, actual_departure)
-                if base_arrival and actual_arrival:
-                    arrival_delay = calculate_delay_minutes(base_arrival, actual_arrival)
-                break
-
-        duration_seconds = journey["duration"]
-        duration_minutes = duration_seconds // 60
-        duration_hours = duration_minutes // 60
-        duration_mins = duration_minutes % 60
-
-        data.append({
-            "ID": idx,
-            "Provider": provider,
-            "Train": train_number,
-            "From": departure_station,
-            "To": arrival_station,
-            "Departure": departure_time.strftime("%H:%M"),
-            "Arrival": arrival_time.strftime("%H:%M"),
-            "Duration": f"{duration_hours}h{duration_mins:02d}",
-            "Dep. Delay": departure_delay,
-            "Arr. Delay": arrival_delay,
-            "Status": "Delayed" if (departure_delay > 5 or arrival_delay > 5) else "On Time",
-            # Store actual datetime objects for sorting
-            "_departure_dt": departure_time,
-            "_arrival_dt": arrival_time,
-        })
-
-    df = pd.DataFrame(data)
-
-    # Sort based on the sort_by parameter
-    if sort_by.lower() == "arrival":
-        df = df.sort_values("_arrival_dt").reset_index(drop=True)
-    else:  # default to departure
-        df = df.sort_values("_departure_dt").reset_index(drop=True)
-
-    # Remove the helper columns
-    df = df.drop(columns=["_departure_dt", "_arrival_dt"])
+        base_departure = actual_departure = base_arrival = actual_arrival = None
+
+        section = _first_public_transport_section(journey)
+        if section is not None:
+            get = section.get
+            departure_station, arrival_station, train_number, provider = _section_labels(section)
+
+            # Delays are only computed when both base and actual times are known
+            base_departure = get("base_departure_date_time")
+            actual_departure = get("departure_date_time")
+            if not (base_departure and actual_departure):
+                base_departure = actual_departure = None
+            base_arrival = get("base_arrival_date_time")
+            actual_arrival = get("arrival_date_time")
+            if not (base_arrival and actual_arrival):
+                base_arrival = actual_arrival = None
+
+        departure_stations.append(departure_station)
+        arrival_stations.append(arrival_station)
+        train_numbers.append(train_number)
+        providers.append(provider)
+        base_departures.append(base_departure)
+        actual_departures.append(actual_departure)
+        base_arrivals.append(base_arrival)
+        actual_arrivals.append(actual_arrival)
+        durations.append(journey["duration"])
+
+    departure_delays = _delay_minutes(
+        _parse_timestamps(base_departures), _parse_timestamps(actual_departures)
+    )
+    arrival_delays = _delay_minutes(
+        _parse_timestamps(base_arrivals), _parse_timestamps(actual_arrivals)
+    )
+    delayed = (departure_delays > 5) | (arrival_delays > 5)
+
+    df = pd.DataFrame(
+        {
+            # Providers and stations repeat across rows, so store them as categoricals
+            "Provider": pd.Categorical(providers),
+            "Train": train_numbers,
+            "From": pd.Categorical(departure_stations),
+            "To": pd.Categorical(arrival_stations),
+            # HH:MM sliced from the fixed-layout timestamps instead of strftime
+            "Departure": [f"{ts[9:11]}:{ts[11:13]}" for ts in departures],
+            "Arrival": [f"{ts[9:11]}:{ts[11:13]}" for ts in arrivals],
+            "Duration": [f"{d // 3600}h{d // 60 % 60:02d}" for d in durations],
+            "Dep. Delay": departure_delays,
+            "Arr. Delay": arrival_delays,
+            # Two-value categorical built straight from the mask: one int8 code per row
+            "Status": pd.Categorical.from_codes(
+                delayed.astype("int8"), categories=["On Time", "Delayed"]
+            ),
+        }
+    )
+
+    # Sort based on the sort_by parameter with one argsort over the int64
+    # nanosecond values, keeping the journey positions as index
+    sort_times = arrivals if sort_by.lower() == "arrival" else departures
+    order = np.argsort(_parse_timestamps(sort_times).asi8, kind="stable")
+    df = df.take(order)
 
     return df, journeys
 
 
-def apply_row_styling(row):
-    """Apply conditional styling to DataFrame rows based on delay."""
-    if row["Status"] == "Delayed":
-        return ["background-color: #ffcccc"] * len(row)
-    return [""] * len(row)
+def apply_row_styling(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply conditional styling to DataFrame rows based on delay.
+
+    Builds the styles for the whole table in one vectorized pass, for use with
+    ``df.style.apply(apply_row_styling, axis=None)``.
+    """
+    styles = pd.DataFrame("", index=df.index, columns=df.columns)
+    styles.loc[df["Status"] == "Delayed", :] = "background-color: #ffcccc"
+    return styles
 
 
 def filter_tgv_journeys(journeys: list, provider_filter: str | None = None) -> list:
@@ -129,30 +199,28 @@ def filter_tgv_journeys(journeys: list, provider_filter: str | None = None) -> l
     Returns:
         Filtered list of journey dictionaries
     """
+    # Resolve the provider filter once instead of re-testing it per journey
+    if provider_filter == "All":
+        provider_filter = None
+
     filtered = []
     for j in journeys:
         # Skip journeys with transfers
         if j.get("nb_transfers", 0) != 0:
             continue
 
-        # Check for high-speed train in sections
-        for section in j.get("sections", []):
-            if section.get("type") == "public_transport":
-                display_info = section.get("display_informations", {})
-                physical_mode = display_info.get("physical_mode", "").lower()
-
-                # Accept any high-speed train based on physical mode
-                # This automatically includes TGV, Trenitalia, Renfe, DB ICE, etc.
-                is_high_speed = "grande vitesse" in physical_mode or "high speed" in physical_mode
-
-                if is_high_speed:
-                    # Apply provider filter if specified
-                    if provider_filter and provider_filter != "All":
-                        if display_info.get("commercial_mode") == provider_filter:
-                            filtered.append(j)
-                    else:
-                        filtered.append(j)
-                break
+        # Check for high-speed train in the first public transport section
+        section = _first_public_transport_section(j)
+        if section is None:
+            continue
+        display_info = section.get("display_informations", _EMPTY)
+
+        # Accept any high-speed train based on physical mode
+        # This automatically includes TGV, Trenitalia, Renfe, DB ICE, etc.
+        if is_high_speed_mode(display_info.get("physical_mode", "")) and (
+            not provider_filter or display_info.get("commercial_mode") == provider_filter
+        ):
+            filtered.append(j)
 
     return filtered
 
@@ -168,10 +236,9 @@ def get_available_providers(journeys: list) -> list[str]:
     """
     providers = set()
     for j in journeys:
-        for section in j.get("sections", []):
-            if section.get("type") == "public_transport":
-                provider = section.get("display_informations", {}).get("commercial_mode")
-                if provider:
-                    providers.add(provider)
-                break
+        section = _first_public_transport_section(j)
+        if section is not None:
+            provider = section.get("display_informations", _EMPTY).get("commercial_mode")
+            if provider:
+                providers.add(provider)
     return sorted(providers)
@@ -1,42 +1,78 @@
-from datetime import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
 
+import orjson
 import requests
 import streamlit as st
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Load environment variables from .env (local) or Streamlit secrets (cloud)
+load_dotenv()
+try:
+    API_KEY = st.secrets.get("SNCF_API_KEY")
+except (AttributeError, FileNotFoundError):
+    API_KEY = os.getenv("SNCF_API_KEY")
 
-API_KEY = "cf2e66b1-d5ef-45cc-87f7-644168728699"
 BASE_URL = "https://api.navitia.io/v1/"
 
+# Shared session so lookups across reruns reuse kept-alive TLS connections,
+# retrying transient gateway errors with a short backoff
+_SESSION = requests.Session()
+_SESSION.headers["Authorization"] = API_KEY or ""
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+
+@st.cache_data(ttl=86400, max_entries=512, show_spinner=False)
 def get_station_id(station_name):
-    """Get the station ID from the station name."""
-    response = requests.get(
-        f"{BASE_URL}coverage/sncf/places?q={station_name}&type[]=stop_area",
-        headers={"Authorization": API_KEY},
+    """Get the station ID from the station name (cached for a day)."""
+    response = _SESSION.get(
+        f"{BASE_URL}coverage/sncf/places",
+        params={"q": station_name, "type[]": "stop_area"},
+        timeout=15,
     )
     response.raise_for_status()
-    places = response.json().get("places")
+    places = orjson.loads(response.content).get("places")
     if places:
         return places[0]["id"]
     return None
 
+@st.cache_data(ttl=30, max_entries=128, show_spinner=False)
 def get_next_departures(departure_station_id, arrival_station_id):
-    """Get the next departures from a station to another."""
-    response = requests.get(
-        f"{BASE_URL}coverage/sncf/journeys?from={departure_station_id}&to={arrival_station_id}",
-        headers={"Authorization": API_KEY},
+    """Get the next departures from a station to another (cached for 30 seconds)."""
+    response = _SESSION.get(
+        f"{BASE_URL}coverage/sncf/journeys",
+        params={"from": departure_station_id, "to": arrival_station_id},
+        timeout=15,
     )
     response.raise_for_status()
-    return response.json().get("journeys")
+    return orjson.loads(response.content).get("journeys")
 
 def main():
     st.title("TGV Times")
 
+    if not API_KEY:
+        st.error("SNCF_API_KEY not found. Set it in your .env file or Streamlit secrets.")
+        return
+
     departure_station = st.text_input("Departure Station", "Paris Gare de Lyon")
     arrival_station = st.text_input("Arrival Station", "Lyon Part-Dieu")
 
     if st.button("Search for trains"):
         with st.spinner("Searching for trains..."):
-            departure_station_id = get_station_id(departure_station)
-            arrival_station_id = get_station_id(arrival_station)
+            # The two lookups are independent round-trips, so run them side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                departure_lookup = executor.submit(get_station_id, departure_station)
+                arrival_lookup = executor.submit(get_station_id, arrival_station)
+                departure_station_id = departure_lookup.result()
+                arrival_station_id = arrival_lookup.result()
 
             if not departure_station_id:
                 st.error(f"Could not find departure station: {departure_station}")
@@ -51,15 +87,16 @@ def main():
             if journeys:
                 st.subheader("Next Departures")
                 for journey in journeys:
-                    departure_time = datetime.strptime(journey["departure_date_time"], "%Y%m%dT%H%M%S")
-                    arrival_time = datetime.strptime(journey["arrival_date_time"], "%Y%m%dT%H%M%S")
+                    # Timestamps have the fixed layout YYYYMMDDTHHMMSS; only HH:MM is shown
+                    departure = journey["departure_date_time"]
+                    arrival = journey["arrival_date_time"]
                     duration_in_seconds = journey["duration"]
                     duration_in_minutes = duration_in_seconds // 60
                     duration_hours = duration_in_minutes // 60
                     duration_minutes = duration_in_minutes % 60
 
-                    st.write(f"**Departure:** {departure_time.strftime('%H:%M')}")
-                    st.write(f"**Arrival:** {arrival_time.strftime('%H:%M')}")
+                    st.write(f"**Departure:** {departure[9:11]}:{departure[11:13]}")
+                    st.write(f"**Arrival:** {arrival[9:11]}:{arrival[11:13]}")
                     st.write(f"**Duration:** {duration_hours}h {duration_minutes}m")
                     st.write("---")
             else: